@@ -0,0 +1,326 @@
+"""The bitboards module contains the tables and helpers used to generate moves with bitboards.
+
+A bitboard is an integer whose 64 lowest bits each stand for a square of the board. The square at
+position (x, y), where x is the rank and y is the file, is mapped to the bit at index x * 8 + y.
+Sets of squares (e.g. the squares occupied by the white pieces, or the squares a rook attacks)
+can thus be combined with a single bitwise operation instead of looping over positions.
+
+All tables are computed once, when the module is first imported, except for the attack tables of
+the sliding pieces, which are filled in as positions are met (see rook_attacks).
+"""
+
+# Directions in which the sliding pieces move, as (rank, file) steps. The
+# first four are the orthogonal directions of a rook and the last four the
+# diagonal directions of a bishop.
+NORTH, SOUTH, EAST, WEST = 0, 1, 2, 3
+NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = 4, 5, 6, 7
+DIRECTION_STEPS = ((-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (-1, -1), (1, 1), (1, -1))
+ORTHOGONAL_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+DIAGONAL_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+
+# Directions along which the square index increases. The first piece met when
+# moving in them is the lowest set bit of the blockers, and the highest set bit
+# for the other directions.
+POSITIVE_DIRECTIONS = frozenset((SOUTH, EAST, SOUTH_EAST, SOUTH_WEST))
+
+# Bitboard with the bits of all the squares of the board set
+ALL_SQUARES = (1 << 64) - 1
+
+# Position of the square of each bit index, created once so that converting
+# bitboards to positions shares these tuples instead of building new ones
+SQUARES = tuple(divmod(index, 8) for index in range(64))
+
+
+def square_index(position: tuple) -> int:
+    """Returns the index of the bit that represents a position in a bitboard.
+
+    Parameters
+    ----------
+    position : tuple
+        Position on the board in (x, y) format, where x is the rank and y is the file.
+
+    Returns
+    -------
+    int
+        Index of the square, between 0 and 63 inclusive.
+    """
+    return position[0] * 8 + position[1]
+
+
+def square_bit(position: tuple) -> int:
+    """Returns a bitboard with only the bit of a given position set.
+
+    Parameters
+    ----------
+    position : tuple
+        Position on the board in (x, y) format, where x is the rank and y is the file.
+
+    Returns
+    -------
+    int
+        Bitboard of the position.
+    """
+    return 1 << (position[0] * 8 + position[1])
+
+
+def from_squares(squares) -> int:
+    """Returns the bitboard with the bits of the given positions set.
+
+    Parameters
+    ----------
+    squares : iterable
+        Positions in (x, y) format.
+
+    Returns
+    -------
+    int
+        Bitboard of the positions.
+    """
+    bitboard = 0
+    for x, y in squares:
+        bitboard |= 1 << (x * 8 + y)
+    return bitboard
+
+
+def to_squares(bitboard: int) -> set:
+    """Returns the positions of the squares set in a bitboard.
+
+    Parameters
+    ----------
+    bitboard : int
+        Bitboard to convert.
+
+    Returns
+    -------
+    set
+        A set of tuples, where each tuple is a position in (x, y) format.
+    """
+    squares = set()
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        squares.add(SQUARES[lowest_bit.bit_length() - 1])
+        bitboard ^= lowest_bit
+    return squares
+
+
+def to_square_tuple(bitboard: int) -> tuple:
+    """Returns the positions of the squares set in a bitboard, in ascending order.
+
+    Parameters
+    ----------
+    bitboard : int
+        Bitboard to convert.
+
+    Returns
+    -------
+    tuple
+        A tuple of tuples, where each tuple is a position in (x, y) format.
+    """
+    squares = []
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        squares.append(SQUARES[lowest_bit.bit_length() - 1])
+        bitboard ^= lowest_bit
+    return tuple(squares)
+
+
+def _build_ray(index: int, direction: int) -> int:
+    # Builds the bitboard of the squares reached when moving from a square in a
+    # direction until the edge of the board, without including the square itself
+    ray = 0
+    step_x, step_y = DIRECTION_STEPS[direction]
+    x, y = divmod(index, 8)
+    x, y = x + step_x, y + step_y
+    while 0 <= x < 8 and 0 <= y < 8:
+        ray |= 1 << (x * 8 + y)
+        x, y = x + step_x, y + step_y
+    return ray
+
+
+# RAYS[direction][index] is the bitboard of the squares between a square and
+# the edge of the board in a direction, on an empty board
+RAYS = tuple(
+    tuple(_build_ray(index, direction) for index in range(64))
+    for direction in range(len(DIRECTION_STEPS))
+)
+
+
+# Squares reached from each square on an empty board by a rook, a bishop and a
+# queen (i.e. the union of the rays in their directions)
+ROOK_RAYS = tuple(
+    RAYS[NORTH][index] | RAYS[SOUTH][index] | RAYS[EAST][index] | RAYS[WEST][index]
+    for index in range(64)
+)
+BISHOP_RAYS = tuple(
+    RAYS[NORTH_EAST][index]
+    | RAYS[NORTH_WEST][index]
+    | RAYS[SOUTH_EAST][index]
+    | RAYS[SOUTH_WEST][index]
+    for index in range(64)
+)
+QUEEN_RAYS = tuple(ROOK_RAYS[index] | BISHOP_RAYS[index] for index in range(64))
+
+
+def _build_step_attacks(index: int, steps: tuple) -> int:
+    # Builds the bitboard of the squares reached from a square with one of the
+    # given (rank, file) steps, leaving out the steps that leave the board
+    attacks = 0
+    x, y = divmod(index, 8)
+    for step_x, step_y in steps:
+        if 0 <= x + step_x < 8 and 0 <= y + step_y < 8:
+            attacks |= 1 << ((x + step_x) * 8 + y + step_y)
+    return attacks
+
+
+# Squares attacked from each square by a knight, a king and a pawn of each color,
+# and squares a pawn of each color moves to with a single or a double step (white
+# pawns move towards rank 0, black pawns towards rank 7)
+KNIGHT_ATTACKS = tuple(
+    _build_step_attacks(
+        index, ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+    )
+    for index in range(64)
+)
+KING_ATTACKS = tuple(_build_step_attacks(index, DIRECTION_STEPS) for index in range(64))
+PAWN_ATTACKS = {
+    "white": tuple(
+        _build_step_attacks(index, ((-1, -1), (-1, 1))) for index in range(64)
+    ),
+    "black": tuple(
+        _build_step_attacks(index, ((1, -1), (1, 1))) for index in range(64)
+    ),
+}
+PAWN_PUSHES = {
+    "white": tuple(_build_step_attacks(index, ((-1, 0),)) for index in range(64)),
+    "black": tuple(_build_step_attacks(index, ((1, 0),)) for index in range(64)),
+}
+PAWN_DOUBLE_PUSHES = {
+    "white": tuple(_build_step_attacks(index, ((-2, 0),)) for index in range(64)),
+    "black": tuple(_build_step_attacks(index, ((2, 0),)) for index in range(64)),
+}
+
+
+def _sliding_attacks(index: int, occupancy: int, directions: tuple) -> int:
+    # Returns the squares attacked by a sliding piece moving in the given
+    # directions. Each ray stops at the first occupied square (included, as the
+    # piece there can be captured), found without walking the ray: the bits of
+    # the ray past that square are exactly the ray starting from it.
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][index]
+        blockers = ray & occupancy
+        if blockers:
+            if direction in POSITIVE_DIRECTIONS:
+                first_blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                first_blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][first_blocker]
+        attacks |= ray
+    return attacks
+
+
+def _build_relevant_mask(index: int, directions: tuple) -> int:
+    # Builds the bitboard of the squares whose occupancy changes the attacks of a
+    # sliding piece: its rays without their last square, as a piece on the edge
+    # of the board does not block anything
+    mask = 0
+    for direction in directions:
+        ray = RAYS[direction][index]
+        if ray:
+            if direction in POSITIVE_DIRECTIONS:
+                last_square = ray.bit_length() - 1
+            else:
+                last_square = (ray & -ray).bit_length() - 1
+            mask |= ray & ~(1 << last_square)
+    return mask
+
+
+ROOK_MASKS = tuple(
+    _build_relevant_mask(index, ORTHOGONAL_DIRECTIONS) for index in range(64)
+)
+BISHOP_MASKS = tuple(
+    _build_relevant_mask(index, DIAGONAL_DIRECTIONS) for index in range(64)
+)
+
+# Attack tables of the sliding pieces, in the spirit of magic bitboards: for
+# each square, the attacks are looked up by the relevant occupancy of the board
+# (occupancy & mask). The relevant occupancy itself is used as the key of a
+# dictionary, which makes the magic multipliers and shifts needed for array
+# indexing unnecessary. There are at most 2 ** 12 keys per square, so entries
+# are computed on first use instead of all at import.
+_ROOK_ATTACKS = tuple({} for _ in range(64))
+_BISHOP_ATTACKS = tuple({} for _ in range(64))
+
+
+def rook_attacks(index: int, occupancy: int) -> int:
+    """Returns the squares attacked by a rook, given the occupied squares of the board.
+
+    Parameters
+    ----------
+    index : int
+        Index of the square of the rook.
+    occupancy : int
+        Bitboard of the occupied squares of the board.
+
+    Returns
+    -------
+    int
+        Bitboard of the attacked squares, including the squares of the first piece met in each direction.
+    """
+    relevant_occupancy = occupancy & ROOK_MASKS[index]
+    attacks = _ROOK_ATTACKS[index].get(relevant_occupancy)
+    if attacks is None:
+        attacks = _sliding_attacks(index, relevant_occupancy, ORTHOGONAL_DIRECTIONS)
+        _ROOK_ATTACKS[index][relevant_occupancy] = attacks
+    return attacks
+
+
+def bishop_attacks(index: int, occupancy: int) -> int:
+    """Returns the squares attacked by a bishop, given the occupied squares of the board.
+
+    Parameters
+    ----------
+    index : int
+        Index of the square of the bishop.
+    occupancy : int
+        Bitboard of the occupied squares of the board.
+
+    Returns
+    -------
+    int
+        Bitboard of the attacked squares, including the squares of the first piece met in each direction.
+    """
+    relevant_occupancy = occupancy & BISHOP_MASKS[index]
+    attacks = _BISHOP_ATTACKS[index].get(relevant_occupancy)
+    if attacks is None:
+        attacks = _sliding_attacks(index, relevant_occupancy, DIAGONAL_DIRECTIONS)
+        _BISHOP_ATTACKS[index][relevant_occupancy] = attacks
+    return attacks
+
+
+def queen_attacks(index: int, occupancy: int) -> int:
+    """Returns the squares attacked by a queen, given the occupied squares of the board.
+
+    Parameters
+    ----------
+    index : int
+        Index of the square of the queen.
+    occupancy : int
+        Bitboard of the occupied squares of the board.
+
+    Returns
+    -------
+    int
+        Bitboard of the attacked squares, including the squares of the first piece met in each direction.
+    """
+    # Same lookups as rook_attacks and bishop_attacks, inlined as queens are
+    # looked up as often as both
+    rook_occupancy = occupancy & ROOK_MASKS[index]
+    attacks = _ROOK_ATTACKS[index].get(rook_occupancy)
+    if attacks is None:
+        attacks = rook_attacks(index, occupancy)
+    bishop_occupancy = occupancy & BISHOP_MASKS[index]
+    diagonal_attacks = _BISHOP_ATTACKS[index].get(bishop_occupancy)
+    if diagonal_attacks is None:
+        diagonal_attacks = bishop_attacks(index, occupancy)
+    return attacks | diagonal_attacks
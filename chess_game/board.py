@@ -3,17 +3,40 @@
 The Board class is responsible for maintaining the chess board and its state. It contains methods
 for moving pieces, promoting pawns, checking if a square is occupied, checking if a square is attacked,
 and checking  if a path is blocked. Additionally, it has a method for refreshing the legal moves
-for all pieces on the board."""
-from typing import Union, Optional
-from chess_game import pieces, constants
+for all pieces on the board.
+
+Alongside the pieces on each square, the Board keeps a bitboard of the squares occupied by each color (see
+the bitboards module), which the pieces use to generate their moves, and a Zobrist hash of the
+position, which the pieces use to cache their legal moves."""
+import random
+from typing import Iterable, Union, Optional
+from chess_game import pieces, constants, bitboards
+
+# Random keys used for the Zobrist hash of a position: one per piece type, color
+# and square. The hash of a position is the XOR of the keys of all its pieces,
+# so it can be updated with a single XOR whenever a square changes.
+ZOBRIST_KEYS = {
+    (name, color): tuple(random.getrandbits(64) for _ in range(64))
+    for name in ("Pawn", "Rook", "Knight", "Bishop", "Queen", "King")
+    for color in ("white", "black")
+}
 
 
 class Board:
     """Class representing the chess board and its pieces/state."""
 
     def __init__(self):
-        self.__board_table = [[None for _ in range(8)] for _ in range(8)]
+        # Pieces on the board (None for empty squares) in a flat list indexed by
+        # the square index x * 8 + y (see the bitboards module)
+        self.__squares = [None] * 64
         self.__piece_list = []
+        self.__occupancy = {"white": 0, "black": 0}
+        self.__position_hash = 0
+        # Key of the piece on each square, as it was added to the position hash
+        self.__square_hashes = [0] * 64
+        # Squares under attack for each color, computed on demand and discarded
+        # whenever the pieces or their legal moves change
+        self.__attacked_squares = {}
 
         # Intialize variables needed for en passant and reverting moves (for
         # is_king_in_check_after_move)
@@ -26,12 +49,109 @@ class Board:
         """A tuple containing all pieces on the board."""
         return tuple(self.__piece_list)
 
+    @property
+    def position_hash(self) -> int:
+        """The Zobrist hash of the pieces on the board. Boards with the same pieces on
+        the same squares have the same hash."""
+        return self.__position_hash
+
+    @property
+    def __board_table(self) -> list:
+        # The pieces on the board as an 8x8 table of ranks, built from the flat
+        # list of squares (used to walk the board rank by rank)
+        return [self.__squares[x * 8 : x * 8 + 8] for x in range(8)]
+
+    def __set_square(self, position: tuple, piece: Optional["pieces.Piece"]) -> None:
+        # Sets the piece at a given position on the board (None to empty the
+        # square) and keeps the occupancy bitboards and position hash in sync with
+        # it
+        index = bitboards.square_index(position)
+        self.__squares[index] = piece
+        bit = 1 << index
+        self.__occupancy["white"] &= ~bit
+        self.__occupancy["black"] &= ~bit
+        self.__position_hash ^= self.__square_hashes[index]
+        self.__square_hashes[index] = 0
+        self.__attacked_squares.clear()
+        if piece is not None:
+            self.__occupancy[piece.color] |= bit
+            self.__square_hashes[index] = ZOBRIST_KEYS[piece.name, piece.color][index]
+            self.__position_hash ^= self.__square_hashes[index]
+
+    def __load_board_table(self, board_table: list) -> None:
+        # Replaces all the pieces on the board with those of an 8x8 board table
+        # (e.g. one parsed from a FEN string) and rebuilds the piece list,
+        # occupancy bitboards and position hash from it
+        self.__squares = [piece for row in board_table for piece in row]
+        self.__piece_list = [piece for piece in self.__squares if piece is not None]
+        self.__occupancy = {"white": 0, "black": 0}
+        self.__position_hash = 0
+        self.__square_hashes = [0] * 64
+        self.__attacked_squares.clear()
+        for piece in self.__piece_list:
+            index = bitboards.square_index(piece.position)
+            self.__occupancy[piece.color] |= 1 << index
+            self.__square_hashes[index] = ZOBRIST_KEYS[piece.name, piece.color][index]
+            self.__position_hash ^= self.__square_hashes[index]
+        self.__refresh_legal_moves()
+
+    def get_occupancy(self, color: Optional[str] = None) -> int:
+        """Returns a bitboard of the squares occupied by the pieces of a given color.
+
+        Parameters
+        ----------
+        color : str, optional
+            Color of the pieces. Must be either "white", "black", or None (default) for
+            the pieces of both colors.
+
+        Returns
+        -------
+        int
+            Bitboard with the bits of the occupied squares set.
+        """
+        if color is None:
+            return self.__occupancy["white"] | self.__occupancy["black"]
+        return self.__occupancy[color]
+
     def __refresh_legal_moves(self) -> None:
         # Refreshes the legal moves for all pieces on the board by calling the
         # refresh_legal_moves method for each
         for piece in self.__piece_list:
             piece.refresh_legal_moves(self)
 
+    def invalidate_attacked_squares(self) -> None:
+        """Discards the cached squares under attack (see get_attacked_squares).
+
+        Must be called whenever the legal moves of a piece on the board change.
+        """
+        self.__attacked_squares.clear()
+
+    def get_attacked_squares(self, color: str) -> int:
+        """Returns a bitboard of the squares under attack for a given color, i.e. the
+        squares in the legal moves of the opponent's pieces.
+
+        The bitboard is cached until the pieces on the board or their legal moves change.
+
+        Parameters
+        ----------
+        color : str
+            Color to check whether the squares are under attack. Must be either "white"
+            or "black".
+
+        Returns
+        -------
+        int
+            Bitboard with the bits of the attacked squares set.
+        """
+        attacked_squares = self.__attacked_squares.get(color)
+        if attacked_squares is None:
+            attacked_squares = 0
+            for piece in self.__piece_list:
+                if piece.color != color:
+                    attacked_squares |= piece.legal_moves_bitboard
+            self.__attacked_squares[color] = attacked_squares
+        return attacked_squares
+
     def get_piece_at_square(self, position: tuple) -> Union["pieces.Piece", None]:
         """Returns the piece at a given position on the board.
 
@@ -47,21 +167,53 @@ class Board:
         """
         if position[0] < 0 or position[0] > 7 or position[1] < 0 or position[1] > 7:
             return None
-        return self.__board_table[position[0]][position[1]]
+        return self.__squares[position[0] * 8 + position[1]]
+
+    def get_piece_at_index(self, index: int) -> Union["pieces.Piece", None]:
+        """Returns the piece on the square with a given index, for callers that already
+        work with square indices (see the bitboards module).
+
+        Parameters
+        ----------
+        index : int
+            Index of the square, x * 8 + y, between 0 and 63 inclusive (not checked).
+
+        Returns
+        -------
+        piece : Piece, None
+            piece on the square with the given index.
+        """
+        return self.__squares[index]
 
     def _place_piece(self, piece: pieces.Piece) -> None:
         # Places a piece on the board at a given position
-        if self.get_piece_at_square(piece.position) is not None:
-            raise ValueError("Square is already occupied!")
-        elif (
-            piece.position[0] < 0
-            or piece.position[0] > 7
-            or piece.position[1] < 0
-            or piece.position[1] > 7
-        ):
-            raise ValueError("Invalid position!")
-        self.__board_table[piece.position[0]][piece.position[1]] = piece
-        self.__piece_list.append(piece)
+        self._place_pieces((piece,))
+
+    def _place_pieces(self, new_pieces: Iterable["pieces.Piece"]) -> None:
+        # Places several pieces on the board at their positions, refreshing the
+        # legal moves once all of them are placed instead of after each piece. All
+        # the pieces are checked before any is placed, so that the board is left
+        # unchanged if one of them can not be placed.
+        new_pieces = tuple(new_pieces)
+        positions = set()
+        for piece in new_pieces:
+            if (
+                piece.position[0] < 0
+                or piece.position[0] > 7
+                or piece.position[1] < 0
+                or piece.position[1] > 7
+            ):
+                raise ValueError("Invalid position!")
+            elif (
+                self.get_piece_at_square(piece.position) is not None
+                or piece.position in positions
+            ):
+                raise ValueError("Square is already occupied!")
+            positions.add(piece.position)
+
+        for piece in new_pieces:
+            self.__set_square(piece.position, piece)
+            self.__piece_list.append(piece)
         self.__refresh_legal_moves()
 
     def _remove_piece_at_square(self, position: tuple) -> None:
@@ -70,7 +222,7 @@ class Board:
             raise ValueError("Invalid position!")
 
         piece = self.get_piece_at_square(position)
-        self.__board_table[position[0]][position[1]] = None
+        self.__set_square(position, None)
 
         if piece is not None:
             self.__piece_list.remove(piece)
@@ -135,9 +287,7 @@ class Board:
             and self.en_passant_piece.color != piece.color
         ):
             occupying_piece = self.en_passant_piece
-            self.__board_table[self.en_passant_piece.position[0]][
-                self.en_passant_piece.position[1]
-            ] = None
+            self.__set_square(self.en_passant_piece.position, None)
 
         # Check if the move was a pawn leaping two squares (used to allow possible en passant next move)
         # (used to detect possibility of en passant)
@@ -158,9 +308,9 @@ class Board:
             self.__piece_list.remove(occupying_piece)
 
         # Move the piece to the new position
-        self.__board_table[piece.position[0]][piece.position[1]] = None
+        self.__set_square(piece.position, None)
         piece.position = new_position
-        self.__board_table[new_position[0]][new_position[1]] = piece
+        self.__set_square(new_position, piece)
 
         # Refresh the legal moves for all pieces
         self.__refresh_legal_moves()
@@ -179,12 +329,10 @@ class Board:
         # Revert the capturing of a piece (if there was one)
         if self.last_piece_captured is not None:
             self.__piece_list.append(self.last_piece_captured)
-            self.__board_table[piece.position[0]][
-                piece.position[1]
-            ] = self.last_piece_captured
+            self.__set_square(piece.position, self.last_piece_captured)
             self.last_piece_captured = None
         else:
-            self.__board_table[piece.position[0]][piece.position[1]] = None
+            self.__set_square(piece.position, None)
 
         # If the piece moved for the first time, set has_moved to False
         if self.has_moved_changed is True:
@@ -193,7 +341,7 @@ class Board:
 
         # Set the piece's position to the old position
         piece.position = old_position
-        self.__board_table[old_position[0]][old_position[1]] = piece
+        self.__set_square(old_position, piece)
 
         self.__refresh_legal_moves()
 
@@ -238,7 +386,7 @@ class Board:
 
         self.__piece_list.remove(piece)
         self.__piece_list.append(new_piece)
-        self.__board_table[piece.position[0]][piece.position[1]] = new_piece
+        self.__set_square(piece.position, new_piece)
         self.__refresh_legal_moves()
 
     def is_square_occupied(self, position: tuple) -> bool:
@@ -262,7 +410,7 @@ class Board:
         if position[0] < 0 or position[0] > 7 or position[1] < 0 or position[1] > 7:
             raise ValueError("Invalid position!")
 
-        return self.__board_table[position[0]][position[1]] is not None
+        return self.__squares[position[0] * 8 + position[1]] is not None
 
     def is_square_attacked(self, position: tuple, color: str) -> bool:
         """Check if a given position on the board is under attack for a given color.
@@ -287,11 +435,7 @@ class Board:
         if position[0] < 0 or position[0] > 7 or position[1] < 0 or position[1] > 7:
             raise ValueError("Invalid position!")
 
-        return any(
-            position in piece.legal_moves
-            for piece in self.piece_list
-            if piece.color != color
-        )
+        return bool(self.get_attacked_squares(color) & bitboards.square_bit(position))
 
     def is_horizontal_path_attacked(
         self, start_position: tuple, end_position: tuple, color: str
@@ -312,10 +456,12 @@ class Board:
         bool
             True if the path is under attack, False otherwise.
         """
-        return any(
-            self.is_square_attacked((start_position[0], i), color)
-            for i in range(start_position[1], end_position[1] + 1)
-        )
+        path = 0
+        for i in range(start_position[1], end_position[1] + 1):
+            if not (0 <= start_position[0] <= 7 and 0 <= i <= 7):
+                raise ValueError("Invalid position!")
+            path |= bitboards.square_bit((start_position[0], i))
+        return bool(self.get_attacked_squares(color) & path)
 
     def is_path_blocked(self, start_position: tuple, end_position: tuple) -> bool:
         """Check if the path between two positions is blocked by a piece.
@@ -373,20 +519,67 @@ class Board:
         """Populate the board with pieces in their starting positions as specified by the STARTING_FEN_FILE
         parameter in the game constants."""
         try:
-            self.__board_table = Board.parse_fen_from_file(constants.STARTING_FEN_FILE)
+            board_table = Board.parse_fen_from_file(constants.STARTING_FEN_FILE)
         except FileNotFoundError:
             print("Starting FEN file not found! Using default starting position.")
-            self.__board_table = Board.parse_fen(
-                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
-            )
-        finally:
-            self.__piece_list = [
-                piece
-                for row in self.__board_table
-                for piece in row
-                if piece is not None
-            ]
-            self.__refresh_legal_moves()
+            board_table = Board.parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+        self.__load_board_table(board_table)
+
+    def clear(self) -> None:
+        """Remove all pieces from the board and reset its state, as if it had just been
+        created. The squares are emptied in place, without allocating new ones."""
+        for index in range(64):
+            self.__squares[index] = None
+        self.__piece_list.clear()
+        self.__occupancy["white"] = 0
+        self.__occupancy["black"] = 0
+        self.__position_hash = 0
+        for index in range(64):
+            self.__square_hashes[index] = 0
+        self.__attacked_squares.clear()
+        self.en_passant_piece = None
+        self.last_piece_captured = None
+        self.has_moved_changed = False
+
+    def snapshot(self) -> tuple:
+        """Returns a snapshot of the state of the board, which can be restored with the
+        restore method.
+
+        The snapshot keeps references to the pieces themselves, along with their
+        positions and whether they have moved, so restoring it puts the same pieces back.
+
+        Returns
+        -------
+        tuple
+            Snapshot of the board.
+        """
+        return (
+            tuple(
+                (piece, piece.position, piece.has_moved) for piece in self.__piece_list
+            ),
+            self.en_passant_piece,
+            self.last_piece_captured,
+            self.has_moved_changed,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """Restores the board to the state it had when a snapshot was taken.
+
+        Parameters
+        ----------
+        snapshot : tuple
+            Snapshot returned by the snapshot method.
+        """
+        self.clear()
+        for piece, position, has_moved in snapshot[0]:
+            piece.position = position
+            piece.has_moved = has_moved
+            self.__set_square(position, piece)
+            self.__piece_list.append(piece)
+        self.en_passant_piece = snapshot[1]
+        self.last_piece_captured = snapshot[2]
+        self.has_moved_changed = snapshot[3]
+        self.__refresh_legal_moves()
 
     @classmethod
     def instantiate_from_fen_file(cls, fen_filepath: str) -> "Board":
@@ -402,26 +595,20 @@ class Board:
         Board
             Board object instantiated from the FEN file."""
         board = cls()
-        board._Board__board_table = Board.parse_fen_from_file(fen_filepath)
-        board._Board__piece_list = [
-            piece
-            for row in board._Board__board_table
-            for piece in row
-            if piece is not None
-        ]
-        board._Board__refresh_legal_moves()
+        board.__load_board_table(Board.parse_fen_from_file(fen_filepath))
         return board
 
     def __repr__(self) -> str:
         # Returns a string representation of the board.
         string = "  a b c d e f g h \n"
+        board_table = self.__board_table
         for i in range(8):
             string += str(8 - i) + " "
             for j in range(8):
-                if self.__board_table[i][j] is None:
+                if board_table[i][j] is None:
                     string += ". "
                 else:
-                    string += self.__board_table[i][j].to_algebraic_notation() + " "
+                    string += board_table[i][j].to_algebraic_notation() + " "
             string += str(8 - i) + "\n"
         string += "  a b c d e f g h \n"
         return string
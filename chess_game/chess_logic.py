@@ -2,6 +2,7 @@
 
 It provides functions to check if a move is legal, if a king is in check, checkmate or stalemate."""
 from typing import TYPE_CHECKING
+from chess_game import bitboards
 
 # USED FOR TYPE HINTING ONLY
 if TYPE_CHECKING:
@@ -24,12 +25,12 @@ def is_check(board: "Board", color: str) -> bool:
     bool
         True if the king is in check, False otherwise.
     """
-    king = [
-        piece
-        for piece in board.piece_list
-        if piece.name == "King" and piece.color == color
-    ][0]
-    return board.is_square_attacked(king.position, color)
+    # The search stops at the king instead of collecting every piece of the list,
+    # and the check itself is a single AND with the board's attacked squares
+    for piece in board.piece_list:
+        if piece.name == "King" and piece.color == color:
+            return board.is_square_attacked(piece.position, color)
+    raise IndexError("No king of the given color on the board.")
 
 
 def is_checkmate(board: "Board", color: str) -> bool:
@@ -135,9 +136,12 @@ def is_legal_move(board: "Board", piece: "Piece", new_position: tuple) -> bool:
     bool
         True if the move is legal, False otherwise.
     """
+    # The occupancy bitboard of the piece's color tells whether the square holds a
+    # piece of the same color without looking the piece up and comparing colors
     if (
-        board.get_piece_at_square(new_position) is not None
-        and board.get_piece_at_square(new_position).color == piece.color
+        0 <= new_position[0] < 8
+        and 0 <= new_position[1] < 8
+        and board.get_occupancy(piece.color) & bitboards.square_bit(new_position)
     ):
         return False
     if piece.name == "Knight":  # Knights can jump over other pieces
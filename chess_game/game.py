@@ -5,6 +5,7 @@ import pygame
 import os.path
 import datetime
 import chess_game.chess_logic as chess_logic
+import chess_game.bitboards as bitboards
 import chess_game.constants as constants
 from chess_game.pieces import King, Pawn
 from chess_game.board import Board
@@ -16,9 +17,15 @@ if TYPE_CHECKING:
 
 class ChessGame:
     """The ChessGame class is responsible for managing the state of the game and making moves on the board.
-    Additionally, it is responsible for logging the moves and checking for game over conditions."""
+    Additionally, it is responsible for logging the moves and checking for game over conditions.
 
-    def __init__(self):
+    Parameters
+    ----------
+    move_log_enabled : bool, optional
+        Whether or not moves should be logged to a file. Defaults to the MOVE_LOG_ENABLED game constant.
+    """
+
+    def __init__(self, move_log_enabled: Optional[bool] = None):
         # Variables for handling the game mechanics
         self.board = Board()
         self.board.populate_board()
@@ -36,7 +43,9 @@ class ChessGame:
 
         # Variable for logging
         self.position_log = []
-        self.move_log_enabled = constants.MOVE_LOG_ENABLED
+        self.move_log_enabled = (
+            constants.MOVE_LOG_ENABLED if move_log_enabled is None else move_log_enabled
+        )
         self.move_log_file_path = (
             constants.MOVE_LOG_DIRECTORY
             + "g_"
@@ -89,7 +98,7 @@ class ChessGame:
             raise TypeError("No piece at the given position.")
         if piece.color != self.turn:
             raise Exception("It is not your turn.")
-        if new_position not in piece.legal_moves:
+        if not piece.legal_moves_bitboard & bitboards.square_bit(new_position):
             raise ValueError("Illegal move.")
         if chess_logic.is_king_in_check_after_move(self.board, piece, new_position):
             raise Exception("This move would put your king in check.")
@@ -138,8 +147,7 @@ class ChessGame:
 
         # Log the current position
         self.position_log.append(self.get_current_game_position())
-        if self.move_log_enabled:
-            self.log_move(piece, original_position, captured_piece)
+        self.log_move(piece, original_position, captured_piece)
 
         # Check for game over conditions
         self.is_checkmate = chess_logic.is_checkmate(self.board, self.turn)
@@ -208,6 +216,9 @@ class ChessGame:
     ) -> None:
         """Logs a move represented in algebraic notation to a move log file.
 
+        Nothing is done (the move is neither parsed into algebraic notation nor is the
+        log file opened) if move logging is disabled.
+
         Parameters
         ----------
         piece : Piece
@@ -217,6 +228,9 @@ class ChessGame:
         captured_piece : Piece, optional
             The piece that was captured by the move, if there is one. Defaults to None.
         """
+        if not self.move_log_enabled:
+            return
+
         move = self.get_move_in_algebraic_notation(
             piece, original_position, captured_piece
         )
@@ -379,7 +393,8 @@ def run_game() -> None:
                             if (
                                 ui.dragged_piece.name == "Pawn"
                                 and new_square[0] in (0, 7)
-                                and new_square in ui.dragged_piece.legal_moves
+                                and ui.dragged_piece.legal_moves_bitboard
+                                & bitboards.square_bit(new_square)
                             ):
                                 ui.promotion_box = PromotionBox(
                                     ui.window, ui.dragged_piece.color
@@ -505,7 +520,8 @@ def run_multiplayer() -> None:
                                 if (
                                     ui.dragged_piece.name == "Pawn"
                                     and new_square[0] in (0, 7)
-                                    and new_square in ui.dragged_piece.legal_moves
+                                    and ui.dragged_piece.legal_moves_bitboard
+                                    & bitboards.square_bit(new_square)
                                 ):
                                     ui.promotion_box = PromotionBox(
                                         ui.window, ui.dragged_piece.color
@@ -1,12 +1,16 @@
 """The pieces module contains the Piece class and its subclasses, which represent the pieces of the chess game.
 
 Each class contains the same data fields and methods, but with different implementations.
-The only abstract method is _generate_possible_moves, which defines how to generate the possible moves for
-a piece, and, therefore, how each piece is supposed to move according to the rules of chess. It is thus
-implemented differently for each subclass.
+The abstract methods are _generate_legal_moves, which generates the legal moves of a piece as a bitboard
+and, therefore, defines how each piece is supposed to move according to the rules of chess, and
+_generate_possible_moves, which generates the candidate moves of a piece (e.g. the whole rays of a sliding
+piece, regardless of the pieces in the way) as a set. They are thus implemented differently for each
+subclass.
 """
-from chess_game import constants, chess_logic
-from typing import TYPE_CHECKING
+import sys
+from collections import OrderedDict
+from chess_game import constants, chess_logic, bitboards
+from typing import TYPE_CHECKING, Optional
 from abc import ABC, abstractmethod
 
 # FOR TYPE HINTS ONLY
@@ -15,19 +19,68 @@ from abc import ABC, abstractmethod
 if TYPE_CHECKING:
     from chess_game.board import Board
 
+# Valid colors of a piece
+COLORS = frozenset(("white", "black"))
+
+# Maximum number of positions for which each piece remembers its legal moves
+LEGAL_MOVES_CACHE_SIZE = 64
+
+# Images of the pieces set by the GUI, by color and name. They are kept out of
+# the pieces themselves, as move generation never reads them and all the
+# pieces of the same color and type are drawn with the same image.
+_IMAGES = {}
+
+# Squares of the first rank (x = 0) between the king and a rook, as bitboards,
+# which must be empty for the king to castle, and squares from the king to the
+# rook (both included on the queen side) which must not be under attack. They
+# are shifted by x * 8 bits to get the masks of rank x.
+QUEEN_SIDE_CASTLING_EMPTY = 0b00001110
+QUEEN_SIDE_CASTLING_SAFE = 0b00011111
+KING_SIDE_CASTLING_EMPTY = 0b01100000
+KING_SIDE_CASTLING_SAFE = 0b11110000
+
+# GUI coordinates of the top left corner of each square, indexed by the square
+# index x * 8 + y (see the bitboards module)
+SQUARE_COORDS = tuple(
+    (y * constants.SQUARE_SIZE, x * constants.SQUARE_SIZE)
+    for x in range(8)
+    for y in range(8)
+)
+
 
 class Piece(ABC):
     """Abstract class that represents a piece of the chess game."""
 
+    # Pieces only ever carry the attributes below, so they are stored in slots
+    # instead of a per-instance dictionary
+    __slots__ = (
+        "name",
+        "value",
+        "__color",
+        "__position",
+        "__coords",
+        "has_moved",
+        "__legal_moves",
+        "__legal_moves_cache",
+    )
+
     def __init__(self, name: str, value: int, color: str, position: tuple) -> None:
         self.name = name
         self.value = value
-        self.__color = color
-        self.image = None
-        self.__position = position
+        # Interned, as in the color setter
+        self.__color = sys.intern(color)
+        # Stored as a tuple, as it is part of the key under which the legal moves
+        # are cached: the shared tuple of the square, as in the position setter,
+        # for a position on the board (which the constructor does not require)
+        x, y = position
+        if 0 <= x < 8 and 0 <= y < 8:
+            self.__position = bitboards.SQUARES[x * 8 + y]
+        else:
+            self.__position = tuple(position)
         self.__coords = ()
         self.has_moved = False
-        self.__legal_moves = set()
+        self.__legal_moves = 0
+        self.__legal_moves_cache = OrderedDict()
         self.__refresh_coords()
 
     @property
@@ -37,10 +90,22 @@ class Piece(ABC):
 
     @color.setter
     def color(self, color: str) -> None:
-        if color not in ("white", "black"):
+        if color not in COLORS:
             raise ValueError("Invalid color.")
         else:
-            self.__color = color
+            # Interned like the "white" and "black" literals used everywhere else,
+            # so that comparing colors is an identity check
+            self.__color = sys.intern(color)
+
+    @property
+    def image(self):
+        """The image used to draw the piece in the GUI, shared by all the pieces of the
+        same color and type (None until the GUI sets it)."""
+        return _IMAGES.get((self.__color, self.name))
+
+    @image.setter
+    def image(self, image) -> None:
+        _IMAGES[self.__color, self.name] = image
 
     @property
     def coords(self) -> tuple:
@@ -54,11 +119,14 @@ class Piece(ABC):
 
     def __refresh_coords(self) -> None:
         # Determines the coordinates of the piece based on its rank, file, and the
-        # defined square size of the GUI.
-        self.__coords = (
-            self.position[1] * constants.SQUARE_SIZE,
-            self.position[0] * constants.SQUARE_SIZE,
-        )
+        # defined square size of the GUI. Positions on the board are looked up
+        # in SQUARE_COORDS; a piece created off the board (which the constructor
+        # allows) gets its coordinates computed.
+        x, y = self.__position
+        if 0 <= x < 8 and 0 <= y < 8:
+            self.__coords = SQUARE_COORDS[x * 8 + y]
+        else:
+            self.__coords = (y * constants.SQUARE_SIZE, x * constants.SQUARE_SIZE)
 
     @property
     def position(self):
@@ -71,14 +139,22 @@ class Piece(ABC):
         if not (0 <= position[0] <= 7 and 0 <= position[1] <= 7):
             raise ValueError("Invalid position.")
         else:
-            self.__position = position
+            # Stored as the shared tuple of the square, like the positions of the
+            # generated moves, so equal positions are usually the same object
+            self.__position = bitboards.SQUARES[position[0] * 8 + position[1]]
             self.__refresh_coords()
 
     @property
     def legal_moves(self) -> tuple:
         """The legal moves of the piece in a tuple of tuples, where each tuple
-        is a position on the board in (x, y) format."""
-        return tuple(self.__legal_moves)
+        is a position on the board in (x, y) format, in ascending order."""
+        return bitboards.to_square_tuple(self.__legal_moves)
+
+    @property
+    def legal_moves_bitboard(self) -> int:
+        """The legal moves of the piece as a bitboard (see the bitboards module). This is
+        how they are stored, so lookups are cheaper than with legal_moves."""
+        return self.__legal_moves
 
     @abstractmethod
     def _generate_possible_moves(self, board: "Board") -> set:
@@ -98,27 +174,61 @@ class Piece(ABC):
     def refresh_legal_moves(self, board: "Board") -> None:
         """Refreshes the legal moves of the piece.
 
+        The legal moves of the last LEGAL_MOVES_CACHE_SIZE positions met are cached, so
+        that they are not generated again when the board has not changed.
+
         Parameters
         ----------
         board : Board
             The board on which the piece is placed.
         """
-        self.__legal_moves = self._generate_legal_moves(board)
-
-    def _generate_legal_moves(self, board: "Board") -> set:
-        # Generate the legal moves for a piece by checking if they comply with
-        # the rules of chess
-        possible_moves = self._generate_possible_moves(board)
-        legal_moves = set(
-            filter(
-                lambda move: (
-                    move != self.position
-                    and chess_logic.is_legal_move(board, self, move)
-                ),
-                possible_moves,
-            )
+        key = self._legal_moves_cache_key(board)
+        if key is None:
+            legal_moves = self._generate_legal_moves(board)
+        else:
+            cache = self.__legal_moves_cache
+            legal_moves = cache.get(key)
+            if legal_moves is None:
+                legal_moves = self._generate_legal_moves(board)
+                cache[key] = legal_moves
+                if len(cache) > LEGAL_MOVES_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(key)
+
+        # The board caches the squares under attack, which depend on the legal moves
+        if legal_moves != self.__legal_moves:
+            self.__legal_moves = legal_moves
+            board.invalidate_attacked_squares()
+
+    def _legal_moves_cache_key(self, board: "Board") -> Optional[tuple]:
+        # Returns the key under which the legal moves of the piece are cached:
+        # everything they depend on, i.e. the pieces on the board (through the
+        # position hash of the board), the piece itself and the en passant target.
+        # None means that the legal moves must not be cached.
+        en_passant_piece = board.en_passant_piece
+        return (
+            board.position_hash,
+            self.position,
+            self.color,
+            self.has_moved,
+            None if en_passant_piece is None else en_passant_piece.position,
         )
-        return legal_moves
+
+    @abstractmethod
+    def _generate_legal_moves(self, board: "Board") -> int:
+        """Generates the legal moves for the piece.
+
+        Parameters
+        ----------
+        board : Board
+            The board on which the piece is placed.
+
+        Returns
+        -------
+        legal_moves : int
+            A bitboard of the legal moves (see the bitboards module).
+        """
 
     # Define a 'constructor' to create piece from algebraic notation
     @staticmethod
@@ -145,21 +255,10 @@ class Piece(ABC):
         name = algebraic_notation.lower()
         color = "black" if name == algebraic_notation else "white"
 
-        match name:
-            case "p":
-                return Pawn(color, position)
-            case "r":
-                return Rook(color, position)
-            case "n":
-                return Knight(color, position)
-            case "b":
-                return Bishop(color, position)
-            case "q":
-                return Queen(color, position)
-            case "k":
-                return King(color, position)
-            case _:
-                raise ValueError("Impossible algebraic notation")
+        piece_class = PIECE_CLASSES.get(name)
+        if piece_class is None:
+            raise ValueError("Impossible algebraic notation")
+        return piece_class(color, position)
 
     def to_algebraic_notation(self) -> str:
         """Returns the algebraic notation of the piece.
@@ -180,90 +279,90 @@ class Piece(ABC):
 
     def __eq__(self, other: "Piece") -> bool:
         # Returns True if the pieces' names, colors, and positions are equal,
-        # False otherwise
-        if not isinstance(other, Piece):
+        # False otherwise. Each piece type has its own class, so comparing the
+        # classes compares the names (and rules out objects that are not pieces).
+        if self is other:
+            return True
+        if type(other) is not type(self):
             return False
 
-        return (
-            self.name == other.name
-            and self.color == other.color
-            and self.position == other.position
-        )
+        return self.__color == other.color and self.__position == other.position
+
+    def __hash__(self) -> int:
+        # Only the name is hashed, as it is the one compared attribute that
+        # never changes once the piece is created (str caches its own hash)
+        return hash(self.name)
 
 
 class Pawn(Piece):
     """Class representing a pawn piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="Pawn", value=1, position=position, color=color)
 
     def _generate_possible_moves(self, board: "Board") -> set:
-        possible_moves = set()
-        # set the direction of the pawn based on its color
-        direction = -1 if self.color == "white" else 1
-
-        # check for a single step forward
-        x_new = self.position[0] + direction
-        if 0 <= x_new < 8 and not board.is_square_occupied((x_new, self.position[1])):
-            possible_moves.add((x_new, self.position[1]))
-
-            # check for a double step forward if the pawn has not moved yet
-            if not self.has_moved:
-                x_new = self.position[0] + 2 * direction
-                if 0 <= x_new < 8 and not board.is_square_occupied(
-                    (x_new, self.position[1])
-                ):
-                    possible_moves.add((x_new, self.position[1]))
-
-        # check for captures
-        for j in [-1, 1]:
-            y_new = self.position[1] + j
-            if 0 <= y_new < 8:
-                x_new = self.position[0] + direction
-                if (
-                    0 <= x_new <= 7
-                    and board.is_square_occupied((x_new, y_new))
-                    and board.get_piece_at_square((x_new, y_new)).color != self.color
-                ):
-                    possible_moves.add((x_new, y_new))
-
-        # check for en passant
-        if (
-            board.en_passant_piece is not None
-            and board.en_passant_piece.color != self.color
-        ):
-            if (
-                0 <= x_new < 8
-                and board.en_passant_piece.position[0] == self.position[0]
-                and abs(board.en_passant_piece.position[1] - self.position[1]) == 1
-            ):
-                possible_moves.add((x_new, board.en_passant_piece.position[1]))
-
-        return possible_moves
+        return bitboards.to_squares(self._generate_moves_bitboard(board))
+
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # The possible moves of a pawn only lead to empty squares or to captures of
+        # the opponent's pieces, so they are all legal, except for an en passant
+        # target square which is occupied by one of its own pieces
+        return self._generate_moves_bitboard(board) & ~board.get_occupancy(self.color)
+
+    def _generate_moves_bitboard(self, board: "Board") -> int:
+        # Generates the moves of the pawn as a bitboard, testing all the candidate
+        # squares at once with masks instead of one by one
+        index = bitboards.square_index(self.position)
+        empty = ~board.get_occupancy()
+
+        # single step forward, and double step if the pawn has not moved yet and
+        # both squares in front of it are empty
+        moves = bitboards.PAWN_PUSHES[self.color][index] & empty
+        if moves and not self.has_moved:
+            moves |= bitboards.PAWN_DOUBLE_PUSHES[self.color][index] & empty
+
+        # check for captures, i.e. attacked squares occupied by an opponent's piece
+        # or the square behind a pawn that can be captured en passant
+        captures = board.get_occupancy("black" if self.color == "white" else "white")
+        en_passant_piece = board.en_passant_piece
+        if en_passant_piece is not None and en_passant_piece.color != self.color:
+            direction = -1 if self.color == "white" else 1
+            x_new = en_passant_piece.position[0] + direction
+            if 0 <= x_new < 8:
+                captures |= bitboards.square_bit((x_new, en_passant_piece.position[1]))
+        return moves | (bitboards.PAWN_ATTACKS[self.color][index] & captures)
 
 
 class Rook(Piece):
     """Class representing a rook piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="Rook", value=5, position=position, color=color)
 
     def _generate_possible_moves(self, board: "Board") -> set:
-        possible_moves = set()
-        x_current, y_current = self.position
-
-        for i, j in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            x_new, y_new = x_current + i, y_current + j
-            while 0 <= x_new < 8 and 0 <= y_new < 8:
-                possible_moves.add((x_new, y_new))
-                x_new += i
-                y_new += j
-        return possible_moves
+        # Horizontal and vertical moves up to the edges of the board
+        return bitboards.to_squares(
+            bitboards.ROOK_RAYS[bitboards.square_index(self.position)]
+        )
+
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # Each ray stops at the first piece on its path, which can be captured
+        # only if it is an opponent's piece
+        attacks = bitboards.rook_attacks(
+            bitboards.square_index(self.position), board.get_occupancy()
+        )
+        return attacks & ~board.get_occupancy(self.color)
 
 
 class Knight(Piece):
     """Class representing a knight piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="Knight", value=3, position=position, color=color)
 
@@ -274,31 +373,20 @@ class Knight(Piece):
         Parameters:
         board (Board): the board on which the piece is placed.
         """
-        possible_moves = set()
-        for i, j in [
-            (2, 1),
-            (1, 2),
-            (-1, 2),
-            (-2, 1),
-            (-2, -1),
-            (-1, -2),
-            (1, -2),
-            (2, -1),
-        ]:
-            x_new, y_new = self.position[0] + i, self.position[1] + j
-            if 0 <= x_new < 8 and 0 <= y_new < 8:
-                if (
-                    not board.is_square_occupied((x_new, y_new))
-                    or board.get_piece_at_square((x_new, y_new)).color != self.color
-                ):
-                    possible_moves.add((x_new, y_new))
+        return bitboards.to_squares(self._generate_legal_moves(board))
 
-        return possible_moves
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # Squares a knight's jump away that are empty or hold an opponent's piece,
+        # as knights jump over the pieces in between
+        index = bitboards.square_index(self.position)
+        return bitboards.KNIGHT_ATTACKS[index] & ~board.get_occupancy(self.color)
 
 
 class Bishop(Piece):
     """Class representing a bishop piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="Bishop", value=3, position=position, color=color)
 
@@ -309,113 +397,129 @@ class Bishop(Piece):
         Parameters:
         board (Board): the board on which the piece is placed.
         """
-        possible_moves = set()
-        (
-            x_current,
-            y_current,
-        ) = self.position
-        for i, j in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
-            x_new, y_new = x_current + i, y_current + j
-            while 0 <= x_new < 8 and 0 <= y_new < 8:
-                possible_moves.add((x_new, y_new))
-                x_new += i
-                y_new += j
-        return possible_moves
+        # Diagonal moves up to the edges of the board
+        return bitboards.to_squares(
+            bitboards.BISHOP_RAYS[bitboards.square_index(self.position)]
+        )
+
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # Each ray stops at the first piece on its path, which can be captured
+        # only if it is an opponent's piece
+        attacks = bitboards.bishop_attacks(
+            bitboards.square_index(self.position), board.get_occupancy()
+        )
+        return attacks & ~board.get_occupancy(self.color)
 
 
 class Queen(Piece):
     """Class representing a queen piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="Queen", value=9, position=position, color=color)
 
     def _generate_possible_moves(self, board: "Board") -> set:
-        possible_moves = set()
-        x_current, y_current = self.position
-        # Diagonal moves
-        for i, j in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
-            x_new, y_new = x_current + i, y_current + j
-            while 0 <= x_new < 8 and 0 <= y_new < 8:
-                possible_moves.add((x_new, y_new))
-                x_new += i
-                y_new += j
-
-        # Horizontal and vertical moves
-        for i, j in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            x_new, y_new = x_current + i, y_current + j
-            while 0 <= x_new < 8 and 0 <= y_new < 8:
-                possible_moves.add((x_new, y_new))
-                x_new += i
-                y_new += j
-        return possible_moves
+        # Diagonal, horizontal and vertical moves up to the edges of the board
+        return bitboards.to_squares(
+            bitboards.QUEEN_RAYS[bitboards.square_index(self.position)]
+        )
+
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # Each ray stops at the first piece on its path, which can be captured
+        # only if it is an opponent's piece
+        attacks = bitboards.queen_attacks(
+            bitboards.square_index(self.position), board.get_occupancy()
+        )
+        return attacks & ~board.get_occupancy(self.color)
 
 
 class King(Piece):
     """Class representing a king piece."""
 
+    __slots__ = ()
+
     def __init__(self, color: str, position: tuple) -> None:
         super().__init__(name="King", value=100, position=position, color=color)
 
+    def _legal_moves_cache_key(self, board: "Board") -> Optional[tuple]:
+        # Castling also depends on the squares attacked by the opponent and on
+        # whether the rooks have moved, which the position hash does not cover,
+        # so the legal moves are only cached once the king can no longer castle
+        if not self.has_moved:
+            return None
+        return super()._legal_moves_cache_key(board)
+
     def _generate_possible_moves(self, board: "Board") -> set:
+        # One step in any direction, and castling
+        possible_moves = bitboards.to_squares(
+            bitboards.KING_ATTACKS[bitboards.square_index(self.position)]
+        )
+        return possible_moves | self._generate_castling_moves(board)
+
+    def _generate_legal_moves(self, board: "Board") -> int:
+        # A step to an adjacent square is legal unless the square holds one of the
+        # king's own pieces, so only the castling moves are checked one by one
+        index = bitboards.square_index(self.position)
+        legal_moves = bitboards.KING_ATTACKS[index] & ~board.get_occupancy(self.color)
+        if self.has_moved:
+            return legal_moves
+        return legal_moves | bitboards.from_squares(
+            move
+            for move in self._generate_castling_moves(board)
+            if move != self.position and chess_logic.is_legal_move(board, self, move)
+        )
+
+    def _generate_castling_moves(self, board: "Board") -> set:
         possible_moves = set()
-        x_current, y_current = self.position
-        for i, j in [
-            (1, 1),
-            (1, 0),
-            (1, -1),
-            (0, 1),
-            (0, -1),
-            (-1, 1),
-            (-1, 0),
-            (-1, -1),
-        ]:
-            x_new, y_new = x_current + i, y_current + j
-            if (i, j) != (0, 0) and 0 <= x_new < 8 and 0 <= y_new < 8:
-                possible_moves.add((x_new, y_new))
-
-        # Castling - check whether the path is blocked or not (use is_path_blocked),
-        # whether any squares in the path are under attack, whether the king has moved or not,
-        # whether the rook has moved or not, and whether the king is under
-        # attack or not.
-        if not self.has_moved:
-            queen_side_rook = board.get_piece_at_square((self.position[0], 0))
-            # Check whether the king can castle queen side
-            if (
-                isinstance(queen_side_rook, Rook)
-                and (not queen_side_rook.has_moved)
-                and (
-                    not board.is_path_blocked(
-                        (self.position[0], 4), (self.position[0], 0)
-                    )
-                )
-                and (
-                    not board.is_horizontal_path_attacked(
-                        (self.position[0], 0), (self.position[0], 4), self.color
-                    )
-                )
-                and (not chess_logic.is_check(board, self.color))
-            ):
-
-                possible_moves.add((self.position[0], 2))
-
-            king_side_rook = board.get_piece_at_square((self.position[0], 7))
-            # Check whether the king can castle king side
-            if (
-                isinstance(king_side_rook, Rook)
-                and (not king_side_rook.has_moved)
-                and (
-                    not board.is_path_blocked(
-                        (self.position[0], 4), (self.position[0], 7)
-                    )
-                )
-                and (
-                    not board.is_horizontal_path_attacked(
-                        (self.position[0], 4), (self.position[0], 7), self.color
-                    )
-                )
-                and (not chess_logic.is_check(board, self.color))
-            ):
-
-                possible_moves.add((self.position[0], 6))
+        # A king that has moved can no longer castle, which is the case for most of
+        # a game, so none of the checks below are needed
+        if self.has_moved:
+            return possible_moves
+
+        # A king in check can not castle. Whether it is in check is read from the
+        # squares attacked by the opponent, which are needed below anyway, instead
+        # of looking the king up again for each side.
+        attacked_squares = board.get_attacked_squares(self.color)
+        if attacked_squares & bitboards.square_bit(self.position):
+            return possible_moves
+
+        # Castling - check whether the path is blocked or not, whether any squares
+        # in the path are under attack (both with a single AND of the castling
+        # masks, moved to the king's rank, with the board's bitboards), and whether
+        # the rook has moved or not.
+        rank = self.position[0]
+        occupancy = board.get_occupancy()
+        queen_side_rook = board.get_piece_at_index(rank * 8)
+        # Check whether the king can castle queen side
+        if (
+            isinstance(queen_side_rook, Rook)
+            and (not queen_side_rook.has_moved)
+            and (not occupancy & (QUEEN_SIDE_CASTLING_EMPTY << rank * 8))
+            and (not attacked_squares & (QUEEN_SIDE_CASTLING_SAFE << rank * 8))
+        ):
+            possible_moves.add(bitboards.SQUARES[rank * 8 + 2])
+
+        king_side_rook = board.get_piece_at_index(rank * 8 + 7)
+        # Check whether the king can castle king side
+        if (
+            isinstance(king_side_rook, Rook)
+            and (not king_side_rook.has_moved)
+            and (not occupancy & (KING_SIDE_CASTLING_EMPTY << rank * 8))
+            and (not attacked_squares & (KING_SIDE_CASTLING_SAFE << rank * 8))
+        ):
+            possible_moves.add(bitboards.SQUARES[rank * 8 + 6])
 
         return possible_moves
+
+
+# Class of the piece for each lowercase algebraic notation letter, used by
+# Piece.from_algebraic_notation
+PIECE_CLASSES = {
+    "p": Pawn,
+    "r": Rook,
+    "n": Knight,
+    "b": Bishop,
+    "q": Queen,
+    "k": King,
+}
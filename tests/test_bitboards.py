@@ -0,0 +1,170 @@
+"""This module contains unit tests for the bitboards module in chess_game/bitboards.py."""
+import unittest
+from chess_game import bitboards
+
+
+class TestBitboards(unittest.TestCase):
+    def test_square_index(self):
+        self.assertEqual(bitboards.square_index((0, 0)), 0)
+        self.assertEqual(bitboards.square_index((0, 7)), 7)
+        self.assertEqual(bitboards.square_index((7, 0)), 56)
+        self.assertEqual(bitboards.square_index((7, 7)), 63)
+
+    def test_square_bit(self):
+        self.assertEqual(bitboards.square_bit((0, 0)), 1)
+        self.assertEqual(bitboards.square_bit((1, 2)), 1 << 10)
+
+    def test_to_squares(self):
+        self.assertEqual(bitboards.to_squares(0), set())
+        self.assertEqual(bitboards.to_squares((1 << 10) | (1 << 63)), {(1, 2), (7, 7)})
+
+    def test_squares(self):
+        self.assertEqual(len(bitboards.SQUARES), 64)
+        self.assertEqual(bitboards.SQUARES[10], (1, 2))
+        # Converted bitboards share the tuples of the table
+        self.assertIs(bitboards.to_square_tuple(1 << 10)[0], bitboards.SQUARES[10])
+
+    def test_from_squares(self):
+        self.assertEqual(bitboards.from_squares(()), 0)
+        self.assertEqual(bitboards.from_squares({(1, 2), (7, 7)}), (1 << 10) | (1 << 63))
+
+    def test_to_square_tuple(self):
+        self.assertEqual(bitboards.to_square_tuple(0), ())
+        self.assertEqual(
+            bitboards.to_square_tuple((1 << 63) | (1 << 10) | 1),
+            ((0, 0), (1, 2), (7, 7)),
+        )
+
+    def test_rays(self):
+        self.assertEqual(
+            bitboards.to_squares(bitboards.RAYS[bitboards.NORTH][20]),
+            {(1, 4), (0, 4)},
+        )
+        self.assertEqual(
+            bitboards.to_squares(bitboards.RAYS[bitboards.SOUTH_WEST][20]),
+            {(3, 3), (4, 2), (5, 1), (6, 0)},
+        )
+        self.assertEqual(bitboards.RAYS[bitboards.WEST][0], 0)
+
+    def test_piece_rays(self):
+        for index in range(64):
+            self.assertEqual(
+                bitboards.ROOK_RAYS[index], bitboards.rook_attacks(index, 0)
+            )
+            self.assertEqual(
+                bitboards.BISHOP_RAYS[index], bitboards.bishop_attacks(index, 0)
+            )
+            self.assertEqual(
+                bitboards.QUEEN_RAYS[index],
+                bitboards.ROOK_RAYS[index] | bitboards.BISHOP_RAYS[index],
+            )
+
+    def test_knight_attacks(self):
+        self.assertEqual(
+            bitboards.to_squares(bitboards.KNIGHT_ATTACKS[1]), {(2, 0), (2, 2), (1, 3)}
+        )
+        self.assertEqual(len(bitboards.to_squares(bitboards.KNIGHT_ATTACKS[36])), 8)
+
+    def test_king_attacks(self):
+        self.assertEqual(
+            bitboards.to_squares(bitboards.KING_ATTACKS[0]), {(0, 1), (1, 0), (1, 1)}
+        )
+        self.assertEqual(len(bitboards.to_squares(bitboards.KING_ATTACKS[36])), 8)
+
+    def test_pawn_attacks(self):
+        self.assertEqual(
+            bitboards.to_squares(bitboards.PAWN_ATTACKS["white"][52]), {(5, 3), (5, 5)}
+        )
+        self.assertEqual(
+            bitboards.to_squares(bitboards.PAWN_ATTACKS["black"][8]), {(2, 1)}
+        )
+        self.assertEqual(bitboards.PAWN_ATTACKS["white"][4], 0)
+
+    def test_pawn_pushes(self):
+        self.assertEqual(
+            bitboards.to_squares(bitboards.PAWN_PUSHES["white"][52]), {(5, 4)}
+        )
+        self.assertEqual(
+            bitboards.to_squares(bitboards.PAWN_DOUBLE_PUSHES["white"][52]), {(4, 4)}
+        )
+        self.assertEqual(
+            bitboards.to_squares(bitboards.PAWN_DOUBLE_PUSHES["black"][8]), {(3, 0)}
+        )
+        self.assertEqual(bitboards.PAWN_PUSHES["black"][60], 0)
+        self.assertEqual(bitboards.PAWN_DOUBLE_PUSHES["white"][12], 0)
+
+    def test_relevant_masks(self):
+        # Rook on a1: its files and rank without the edges of the board
+        self.assertEqual(
+            bitboards.to_squares(bitboards.ROOK_MASKS[56]),
+            {(i, 0) for i in range(1, 7)} | {(7, i) for i in range(1, 7)},
+        )
+        # Bishop on e4: its diagonals without the edges of the board
+        self.assertEqual(
+            bitboards.to_squares(bitboards.BISHOP_MASKS[36]),
+            {(3, 3), (2, 2), (1, 1), (5, 5), (6, 6), (3, 5), (2, 6), (5, 3), (6, 2)},
+        )
+
+    def test_attacks_ignore_irrelevant_occupancy(self):
+        # Pieces beyond the first blocker or on the edge of the board do not
+        # change the attacks, so the same table entry is used
+        index = bitboards.square_index((4, 4))
+        occupancy = bitboards.square_bit((4, 6))
+        self.assertEqual(
+            bitboards.rook_attacks(index, occupancy),
+            bitboards.rook_attacks(index, occupancy | bitboards.square_bit((4, 7))),
+        )
+        self.assertEqual(
+            bitboards.bishop_attacks(index, 0),
+            bitboards.bishop_attacks(index, bitboards.square_bit((7, 7))),
+        )
+
+    def test_rook_attacks(self):
+        # Rook on a1 on an empty board
+        attacks = bitboards.rook_attacks(56, 0)
+        self.assertEqual(
+            bitboards.to_squares(attacks),
+            {(i, 0) for i in range(7)} | {(7, i) for i in range(1, 8)},
+        )
+
+        # Rays stop at (and include) the first piece met
+        occupancy = bitboards.square_bit((4, 0)) | bitboards.square_bit((7, 2))
+        attacks = bitboards.rook_attacks(56, occupancy)
+        self.assertEqual(
+            bitboards.to_squares(attacks), {(6, 0), (5, 0), (4, 0), (7, 1), (7, 2)}
+        )
+
+    def test_bishop_attacks(self):
+        occupancy = bitboards.square_bit((2, 2)) | bitboards.square_bit((6, 6))
+        attacks = bitboards.bishop_attacks(bitboards.square_index((4, 4)), occupancy)
+        self.assertEqual(
+            bitboards.to_squares(attacks),
+            {
+                (3, 3),
+                (2, 2),
+                (5, 5),
+                (6, 6),
+                (3, 5),
+                (2, 6),
+                (1, 7),
+                (5, 3),
+                (6, 2),
+                (7, 1),
+            },
+        )
+
+    def test_queen_attacks(self):
+        index = bitboards.square_index((4, 4))
+        occupancy = bitboards.square_bit((4, 6)) | bitboards.square_bit((2, 2))
+        self.assertEqual(
+            bitboards.queen_attacks(index, occupancy),
+            bitboards.rook_attacks(index, occupancy)
+            | bitboards.bishop_attacks(index, occupancy),
+        )
+        self.assertEqual(
+            len(bitboards.to_squares(bitboards.queen_attacks(index, 0))), 27
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
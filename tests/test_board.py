@@ -6,9 +6,17 @@ from chess_game import pieces, board, constants
 
 
 class TestBoard(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Board populated once and restored to the starting position before each
+        # test, instead of creating and populating a new board every time
+        cls.start_board = board.Board()
+        cls.start_board.populate_board()
+        cls.start_snapshot = cls.start_board.snapshot()
+
     def setUp(self):
-        self.board = board.Board()
-        self.board.populate_board()
+        self.board = self.start_board
+        self.board.restore(self.start_snapshot)
 
     def test_init(self):
         self.board = board.Board()
@@ -67,6 +75,99 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(self.board.get_piece_at_square((-1, 0)), None)
         self.assertEqual(self.board.get_piece_at_square((0, -1)), None)
 
+    def test_get_piece_at_index(self):
+        self.assertIs(
+            self.board.get_piece_at_index(56), self.board.get_piece_at_square((7, 0))
+        )
+        self.assertIs(
+            self.board.get_piece_at_index(7), self.board.get_piece_at_square((0, 7))
+        )
+        self.assertIsNone(self.board.get_piece_at_index(36))
+
+    def test_get_occupancy(self):
+        white = sum(1 << i for i in range(48, 64))
+        black = sum(1 << i for i in range(16))
+        self.assertEqual(self.board.get_occupancy("white"), white)
+        self.assertEqual(self.board.get_occupancy("black"), black)
+        self.assertEqual(self.board.get_occupancy(), white | black)
+
+        # Occupancy follows moves, captures and reverted moves
+        piece = self.board.get_piece_at_square((6, 0))
+        self.board.move_piece_to_square(piece, (1, 1))
+        self.assertEqual(
+            self.board.get_occupancy("white"), white ^ (1 << 48) ^ (1 << 9)
+        )
+        self.assertEqual(self.board.get_occupancy("black"), black ^ (1 << 9))
+        self.board.revert_move(piece, (6, 0))
+        self.assertEqual(self.board.get_occupancy("white"), white)
+        self.assertEqual(self.board.get_occupancy("black"), black)
+
+        self.board._remove_piece_at_square((0, 0))
+        self.assertEqual(self.board.get_occupancy("black"), black ^ 1)
+
+    def test_position_hash(self):
+        start_hash = self.board.position_hash
+        other_board = board.Board()
+        other_board.populate_board()
+        self.assertEqual(other_board.position_hash, start_hash)
+
+        # The hash changes with the position and is restored when a move is reverted
+        piece = self.board.get_piece_at_square((6, 0))
+        self.board.move_piece_to_square(piece, (1, 1))
+        self.assertNotEqual(self.board.position_hash, start_hash)
+        self.board.revert_move(piece, (6, 0))
+        self.assertEqual(self.board.position_hash, start_hash)
+
+        self.board._remove_piece_at_square((0, 0))
+        self.assertNotEqual(self.board.position_hash, start_hash)
+        self.board._place_piece(pieces.Rook("black", (0, 0)))
+        self.assertEqual(self.board.position_hash, start_hash)
+
+    def test_squares(self):
+        # The pieces on the squares follow moves and reverted moves
+        fen_board = self.board._get_fen_board()
+        piece = self.board.get_piece_at_square((6, 0))
+        self.board.move_piece_to_square(piece, (1, 1))
+        self.assertIs(self.board.get_piece_at_square((1, 1)), piece)
+        self.assertIsNone(self.board.get_piece_at_square((6, 0)))
+        self.assertNotEqual(self.board._get_fen_board(), fen_board)
+        self.board.revert_move(piece, (6, 0))
+        self.assertIs(self.board.get_piece_at_square((6, 0)), piece)
+        self.assertEqual(self.board.get_piece_at_square((1, 1)).name, "Pawn")
+        self.assertEqual(self.board._get_fen_board(), fen_board)
+
+    def test_clear(self):
+        self.board.en_passant_piece = self.board.get_piece_at_square((6, 0))
+        self.board.clear()
+        self.assertEqual(self.board.piece_list, ())
+        self.assertEqual(
+            self.board._Board__board_table, [[None for _ in range(8)] for _ in range(8)]
+        )
+        self.assertEqual(self.board.get_occupancy(), 0)
+        self.assertEqual(self.board.position_hash, board.Board().position_hash)
+        self.assertIsNone(self.board.en_passant_piece)
+
+        # The board can be used again after being cleared
+        self.board._place_piece(pieces.Rook("white", (0, 0)))
+        self.assertEqual(self.board.get_occupancy("white"), 1)
+        self.assertEqual(len(self.board.get_piece_at_square((0, 0)).legal_moves), 14)
+
+    def test_snapshot_restore(self):
+        snapshot = self.board.snapshot()
+        fen_board = self.board._get_fen_board()
+        pawn = self.board.get_piece_at_square((6, 4))
+        self.board.move_piece_to_square(pawn, (4, 4))
+        self.board._remove_piece_at_square((0, 0))
+        self.board._place_piece(pieces.Queen("white", (3, 3)))
+
+        self.board.restore(snapshot)
+        self.assertEqual(self.board._get_fen_board(), fen_board)
+        self.assertIs(self.board.get_piece_at_square((6, 4)), pawn)
+        self.assertFalse(pawn.has_moved)
+        self.assertIsNone(self.board.en_passant_piece)
+        self.assertEqual(pawn.legal_moves, ((4, 4), (5, 4)))
+        self.assertEqual(len(self.board.piece_list), 32)
+
     def test_place_piece(self):
         self.board._place_piece(pieces.Pawn("white", (4, 4)))
         self.assertEqual(self.board.get_piece_at_square((4, 4)).name, "Pawn")
@@ -80,6 +181,29 @@ class TestBoard(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.board._place_piece(pieces.Pawn("white", (7, 0)))
 
+    def test_place_pieces(self):
+        knight = pieces.Knight("white", (4, 4))
+        self.board._place_pieces([pieces.Pawn("black", (4, 3)), knight])
+        self.assertEqual(self.board.get_piece_at_square((4, 3)).name, "Pawn")
+        self.assertIs(self.board.get_piece_at_square((4, 4)), knight)
+        self.assertIn(knight, self.board.piece_list)
+        # The legal moves are refreshed once all the pieces are placed
+        self.assertIn((2, 3), knight.legal_moves)
+        self.assertTrue(self.board.get_occupancy("black") & (1 << 35))
+
+        with self.assertRaises(ValueError):
+            self.board._place_pieces([pieces.Pawn("white", (7, 0))])
+
+    def test_place_pieces_error_leaves_board_unchanged(self):
+        knight = pieces.Knight("white", (4, 3))
+        with self.assertRaises(ValueError):
+            self.board._place_pieces([knight, pieces.Pawn("white", (7, 0))])
+        with self.assertRaises(ValueError):
+            self.board._place_pieces([knight, pieces.Pawn("white", (4, 3))])
+        self.assertIsNone(self.board.get_piece_at_square((4, 3)))
+        self.assertNotIn(knight, self.board.piece_list)
+        self.assertEqual(len(self.board.piece_list), 32)
+
     def test_remove_piece_at_square(self):
         self.board._remove_piece_at_square((7, 0))
         self.assertEqual(self.board.get_piece_at_square((7, 0)), None)
@@ -218,10 +342,14 @@ class TestBoard(unittest.TestCase):
 
     def test_promote_pawn(self):
         test_board = board.Board()
-        test_board._place_piece(pieces.Pawn("white", (0, 0)))
-        test_board._place_piece(pieces.Pawn("black", (7, 0)))
-        test_board._place_piece(pieces.Pawn("white", (0, 2)))
-        test_board._place_piece(pieces.Pawn("black", (7, 2)))
+        test_board._place_pieces(
+            [
+                pieces.Pawn("white", (0, 0)),
+                pieces.Pawn("black", (7, 0)),
+                pieces.Pawn("white", (0, 2)),
+                pieces.Pawn("black", (7, 2)),
+            ]
+        )
 
         # Test promotion on invalid piece
         test_board._place_piece(pieces.Rook("white", (0, 1)))
@@ -276,6 +404,27 @@ class TestBoard(unittest.TestCase):
         self.assertTrue(self.board.is_square_attacked((1, 0), "black"))
         self.assertFalse(self.board.is_square_attacked((7, 0), "white"))
 
+    def test_get_attacked_squares(self):
+        # White pawns and knights attack the 3rd and 4th ranks at the start
+        self.assertEqual(
+            self.board.get_attacked_squares("black"), sum(1 << i for i in range(32, 48))
+        )
+        self.assertEqual(
+            self.board.get_attacked_squares("white"), sum(1 << i for i in range(16, 32))
+        )
+
+        # The cached squares are discarded when the board changes
+        self.board._remove_piece_at_square((6, 0))
+        self.assertTrue(self.board.get_attacked_squares("black") & (1 << 8))
+        self.assertEqual(
+            self.board.get_attacked_squares("black"),
+            sum(1 << i for i in range(32, 48))
+            | (1 << 48)
+            | (1 << 24)
+            | (1 << 16)
+            | (1 << 8),
+        )
+
     def test_is_square_attacked_out_of_bounds(self):
         with self.assertRaises(ValueError):
             self.board.is_square_attacked((8, 0), "white")
@@ -304,9 +453,13 @@ class TestBoard(unittest.TestCase):
             "./game/game_states/test_stalemate.fen"
         )
         test_board = board.Board()
-        test_board._place_piece(pieces.King("black", (0, 5)))
-        test_board._place_piece(pieces.Pawn("white", (1, 5)))
-        test_board._place_piece(pieces.King("white", (2, 5)))
+        test_board._place_pieces(
+            [
+                pieces.King("black", (0, 5)),
+                pieces.Pawn("white", (1, 5)),
+                pieces.King("white", (2, 5)),
+            ]
+        )
 
         self.assertEqual(
             test_fen_board._Board__board_table, test_board._Board__board_table
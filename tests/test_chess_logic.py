@@ -83,10 +83,14 @@ class TestChessLogic(unittest.TestCase):
         self.assertFalse(chess_logic.is_stalemate(test_board, "white"))
 
         test_board._remove_piece_at_square((1, 5))
-        test_board._place_piece(pieces.Rook("black", (0, 4)))
-        test_board._place_piece(pieces.Rook("black", (0, 6)))
-        test_board._place_piece(pieces.Rook("black", (1, 7)))
-        test_board._place_piece(pieces.Rook("black", (3, 7)))
+        test_board._place_pieces(
+            [
+                pieces.Rook("black", (0, 4)),
+                pieces.Rook("black", (0, 6)),
+                pieces.Rook("black", (1, 7)),
+                pieces.Rook("black", (3, 7)),
+            ]
+        )
 
         # Test that the game is not in stalemate for black and it is for white
         self.assertFalse(chess_logic.is_stalemate(test_board, "black"))
@@ -1,20 +1,26 @@
 """This module contains unit tests for the ChessGame class in chess_game/game.py."""
 import unittest
-from unittest.mock import patch, mock_open
 from chess_game.game import ChessGame
 from chess_game import board, pieces
 
 
 class TestChessGame(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Reference board in the starting position, only read by the tests
+        cls.start_board = board.Board()
+        cls.start_board.populate_board()
+
+    @staticmethod
+    def new_game():
+        # Games under test never write a move log unless a test enables it
+        return ChessGame(move_log_enabled=False)
+
     def setUp(self):
-        self.game = ChessGame()
-        self.game.move_log_enabled = False
+        self.game = self.new_game()
 
     def test_init(self):
-        test_board = board.Board()
-        test_board.populate_board()
-
-        self.assertEqual(self.game.board.piece_list, test_board.piece_list)
+        self.assertEqual(self.game.board.piece_list, self.start_board.piece_list)
 
         captured_pieces = {"white": [], "black": []}
         self.assertEqual(self.game.captured_pieces, captured_pieces)
@@ -35,21 +41,21 @@ class TestChessGame(unittest.TestCase):
 
     def test_make_move_errors(self):
         # No piece at position
-        with self.assertRaises(TypeError):
+        with self.assertRaisesRegex(TypeError, "No piece"):
             self.game.make_move((4, 4), (5, 5))
 
         # Wrong color piece
-        with self.assertRaises(Exception):
+        with self.assertRaisesRegex(Exception, "not your turn"):
             self.game.make_move((1, 0), (2, 0))
 
         # Illegal move
-        with self.assertRaises(ValueError):
+        with self.assertRaisesRegex(ValueError, "Illegal move"):
             self.game.make_move((6, 0), (4, 4))
 
         # The move places the player's own king in check
         self.game.board._place_piece(pieces.Queen(color="black", position=(5, 2)))
 
-        with self.assertRaises(Exception):
+        with self.assertRaisesRegex(Exception, "put your king in check"):
             self.game.make_move((6, 3), (5, 3))
 
     def test_make_move_castle(self):
@@ -95,8 +101,8 @@ class TestChessGame(unittest.TestCase):
         self.game.board._place_piece(white_pawn)
 
         # Test wrong promotion choice
-        with self.assertRaises(ValueError):
-            self.game.promotion_choice = "F"
+        self.game.promotion_choice = "F"
+        with self.assertRaisesRegex(ValueError, "Invalid choice"):
             self.game.make_move((1, 0), (0, 0))
 
         self.game.turn = "black"
@@ -179,8 +185,7 @@ class TestChessGame(unittest.TestCase):
         self.assertTrue(self.game.is_checkmate)
 
         # Test stalemate
-        self.game = ChessGame()
-        self.game.move_log_enabled = False
+        self.game = self.new_game()
 
         self.game.board = board.Board.instantiate_from_fen_file(
             "./game/game_states/test_stalemate.fen"
@@ -192,21 +197,17 @@ class TestChessGame(unittest.TestCase):
         self.assertTrue(self.game.is_stalemate)
 
         # Test threefold repetition
-        self.game = ChessGame()
-        self.game.move_log_enabled = False
-        # Move knights back and forth
-        self.game.make_move((7, 1), (5, 0))
-        self.game.make_move((0, 1), (2, 0))
-        self.assertFalse(self.game.is_threefold_repetition)
-        self.game.make_move((5, 0), (7, 1))
-        self.game.make_move((2, 0), (0, 1))
-        self.assertFalse(self.game.is_threefold_repetition)
-        self.game.make_move((7, 1), (5, 0))
-        self.game.make_move((0, 1), (2, 0))
-        self.assertFalse(self.game.is_threefold_repetition)
-        self.game.make_move((5, 0), (7, 1))
-        self.game.make_move((2, 0), (0, 1))
-        self.assertTrue(self.game.is_threefold_repetition)
+        self.game = self.new_game()
+        # Move knights back and forth (out and back in alternating rounds), the
+        # starting position occurs for the third time after the fourth round
+        knight_moves = (
+            (((7, 1), (5, 0)), ((0, 1), (2, 0))),
+            (((5, 0), (7, 1)), ((2, 0), (0, 1))),
+        )
+        for i in range(4):
+            for original_position, new_position in knight_moves[i % 2]:
+                self.game.make_move(original_position, new_position)
+            self.assertEqual(self.game.is_threefold_repetition, i == 3)
 
     def test_make_move_position_log(self):
         # Test logging
@@ -218,17 +219,21 @@ class TestChessGame(unittest.TestCase):
         self.assertEqual(self.game.position_log, log)
 
     def test_make_move_move_log_file(self):
-        self.game.move_log_enabled = True
-        with patch("builtins.open", mock_open()) as mock_file:
-            self.game.make_move((6, 4), (4, 4))
-            mock_file.assert_called_with(self.game.move_log_file_path, "a")
-            mock_file().write.assert_called_with("1. e4 ")
+        from unittest.mock import patch, mock_open
 
-            self.game.make_move((1, 3), (3, 3))
-            mock_file().write.assert_called_with("d5\n")
+        # Moves played in order, each with the entry it appends to the log file
+        moves = (
+            ((6, 4), (4, 4), "1. e4 "),
+            ((1, 3), (3, 3), "d5\n"),
+            ((4, 4), (3, 3), "2. exd5 "),
+        )
 
-            self.game.make_move((4, 4), (3, 3))
-            mock_file().write.assert_called_with("2. exd5 ")
+        self.game.move_log_enabled = True
+        with patch("builtins.open", mock_open()) as mock_file:
+            for original_position, new_position, entry in moves:
+                self.game.make_move(original_position, new_position)
+                mock_file.assert_called_with(self.game.move_log_file_path, "a")
+                mock_file().write.assert_called_with(entry)
 
     def test_get_current_game_position(self):
         start_state = {
@@ -253,21 +258,17 @@ class TestChessGame(unittest.TestCase):
         self.game.make_move((6, 0), (5, 0))
         self.game.make_move((1, 0), (2, 0))
         self.assertFalse(self.game.check_threefold_repetition())
-        self.game.make_move((7, 0), (6, 0))
-        self.game.make_move((0, 0), (1, 0))
-        self.assertFalse(self.game.check_threefold_repetition())
-        self.game.make_move((6, 0), (7, 0))
-        self.game.make_move((1, 0), (0, 0))
-        self.assertFalse(self.game.check_threefold_repetition())
-        self.game.make_move((7, 0), (6, 0))
-        self.game.make_move((0, 0), (1, 0))
-        self.assertFalse(self.game.check_threefold_repetition())
-        self.game.make_move((6, 0), (7, 0))
-        self.game.make_move((1, 0), (0, 0))
-        self.assertFalse(self.game.check_threefold_repetition())
-        self.game.make_move((7, 0), (6, 0))
-        self.game.make_move((0, 0), (1, 0))
-        self.assertTrue(self.game.check_threefold_repetition())
+
+        # Move rooks back and forth (up and down in alternating rounds), the
+        # position after the first round occurs for the third time after the fifth
+        rook_moves = (
+            (((7, 0), (6, 0)), ((0, 0), (1, 0))),
+            (((6, 0), (7, 0)), ((1, 0), (0, 0))),
+        )
+        for i in range(5):
+            for original_position, new_position in rook_moves[i % 2]:
+                self.game.make_move(original_position, new_position)
+            self.assertEqual(self.game.check_threefold_repetition(), i == 4)
 
     def test_get_fen_game_state(self):
         start_state = {
@@ -293,6 +294,8 @@ class TestChessGame(unittest.TestCase):
         self.assertEqual(self.game.get_fen_game_state(), state)
 
     def test_log_move(self):
+        from unittest.mock import patch, mock_open
+
         self.game.move_log_enabled = True
         with patch("builtins.open", mock_open()) as mock_file:
             white_pawn = self.game.board.get_piece_at_square((6, 4))
@@ -313,6 +316,17 @@ class TestChessGame(unittest.TestCase):
             self.game.log_move(black_pawn, (3, 3))
             mock_file().write.assert_called_with("d5\n")
 
+    def test_log_move_disabled_no_open(self):
+        from unittest.mock import patch, mock_open
+
+        with patch("builtins.open", mock_open()) as mock_file:
+            self.game.make_move((6, 4), (4, 4))
+            self.game.make_move((1, 3), (3, 3))
+            self.game.make_move((4, 4), (3, 3))
+            self.game.make_move((0, 3), (3, 3))
+            self.game.make_move((7, 6), (5, 5))
+            mock_file.assert_not_called()
+
     def test_get_move_in_algebraic_notation_castle(self):
         # Test castle queenside
         expected_result = "O-O-O"
@@ -338,9 +352,13 @@ class TestChessGame(unittest.TestCase):
         self.game.board = board.Board()
 
         piece = pieces.Pawn(color="white", position=(1, 0))
-        self.game.board._place_piece(piece)
-        self.game.board._place_piece(pieces.King(color="black", position=(3, 2)))
-        self.game.board._place_piece(pieces.King(color="white", position=(7, 0)))
+        self.game.board._place_pieces(
+            [
+                piece,
+                pieces.King(color="black", position=(3, 2)),
+                pieces.King(color="white", position=(7, 0)),
+            ]
+        )
 
         self.game.promotion_choice = "Q"
         self.game.make_move((1, 0), (0, 0))
@@ -357,9 +375,13 @@ class TestChessGame(unittest.TestCase):
 
         # Create new board
         self.game.board = board.Board()
-        self.game.board._place_piece(white_pawn)
-        self.game.board._place_piece(pieces.King(color="black", position=(3, 2)))
-        self.game.board._place_piece(pieces.King(color="white", position=(7, 0)))
+        self.game.board._place_pieces(
+            [
+                white_pawn,
+                pieces.King(color="black", position=(3, 2)),
+                pieces.King(color="white", position=(7, 0)),
+            ]
+        )
 
         self.assertEqual(
             self.game.get_move_in_algebraic_notation(white_pawn, (3, 2), black_pawn),
@@ -374,9 +396,13 @@ class TestChessGame(unittest.TestCase):
 
         # Create new board
         self.game.board = board.Board()
-        self.game.board._place_piece(white_pawn)
-        self.game.board._place_piece(pieces.King(color="black", position=(3, 2)))
-        self.game.board._place_piece(pieces.King(color="white", position=(7, 0)))
+        self.game.board._place_pieces(
+            [
+                white_pawn,
+                pieces.King(color="black", position=(3, 2)),
+                pieces.King(color="white", position=(7, 0)),
+            ]
+        )
 
         self.assertEqual(
             self.game.get_move_in_algebraic_notation(white_pawn, (2, 2), black_pawn),
@@ -391,9 +417,13 @@ class TestChessGame(unittest.TestCase):
 
         # Create new board
         self.game.board = board.Board()
-        self.game.board._place_piece(white_rook)
-        self.game.board._place_piece(pieces.King(color="black", position=(3, 2)))
-        self.game.board._place_piece(pieces.King(color="white", position=(7, 0)))
+        self.game.board._place_pieces(
+            [
+                white_rook,
+                pieces.King(color="black", position=(3, 2)),
+                pieces.King(color="white", position=(7, 0)),
+            ]
+        )
 
         self.assertEqual(
             self.game.get_move_in_algebraic_notation(white_rook, (2, 2), black_pawn),
@@ -428,9 +458,13 @@ class TestChessGame(unittest.TestCase):
         # Create new board
         self.game.board = board.Board()
         self.game.turn = "black"
-        self.game.board._place_piece(rook)
-        self.game.board._place_piece(pieces.King(color="black", position=(3, 2)))
-        self.game.board._place_piece(pieces.King(color="white", position=(7, 0)))
+        self.game.board._place_pieces(
+            [
+                rook,
+                pieces.King(color="black", position=(3, 2)),
+                pieces.King(color="white", position=(7, 0)),
+            ]
+        )
 
         self.assertEqual(
             self.game.get_move_in_algebraic_notation(rook, (6, 4)), expected_result
@@ -1,12 +1,24 @@
 """This module contains unit tests for the pieces module in chess_game/pieces.py."""
-from chess_game import pieces, board, constants
+from chess_game import pieces, board, constants, bitboards
 import unittest
+import unittest.mock
+
+# Board shared by all tests, restored to an empty board before each one
+shared_board = None
+empty_board_snapshot = None
+
+
+def setUpModule():
+    global shared_board, empty_board_snapshot
+    shared_board = board.Board()
+    empty_board_snapshot = shared_board.snapshot()
 
 
 class TestPiece(unittest.TestCase):
     def setUp(self):
         self.piece = pieces.Pawn(color="black", position=(0, 0))
-        self.board = board.Board()
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
         self.board._place_piece(self.piece)
 
     def test_init(self):
@@ -17,14 +29,27 @@ class TestPiece(unittest.TestCase):
         self.assertIsNone(self.piece.image)
         self.assertEqual(self.piece.coords, (0, 0))
         self.assertEqual(self.piece.legal_moves, ((1, 0), (2, 0)))
+        self.assertIs(pieces.Pawn("".join(("wh", "ite")), (6, 0)).color, "white")
 
     def test_color(self):
         self.assertEqual(self.piece.color, "black")
         self.piece.color = "white"
         self.assertEqual(self.piece.color, "white")
+        self.piece.color = "".join(("bl", "ack"))
+        self.assertIs(self.piece.color, "black")
         with self.assertRaises(ValueError):
             self.piece.color = "blue"
 
+    def test_image(self):
+        self.assertIsNone(self.piece.image)
+        self.addCleanup(setattr, self.piece, "image", None)
+        self.piece.image = "black-pawn"
+        self.assertEqual(self.piece.image, "black-pawn")
+        # The image is shared by the pieces of the same color and type
+        self.assertEqual(pieces.Pawn("black", (1, 1)).image, "black-pawn")
+        self.assertIsNone(pieces.Pawn("white", (1, 1)).image)
+        self.assertIsNone(pieces.Rook("black", (1, 1)).image)
+
     def test_coords(self):
         self.assertEqual(self.piece.coords, (0, 0))
         self.piece.coords = (100, 200)
@@ -34,6 +59,7 @@ class TestPiece(unittest.TestCase):
         self.assertEqual(self.piece.position, (0, 0))
         self.piece.position = (7, 7)
         self.assertEqual(self.piece.position, (7, 7))
+        self.assertIs(self.piece.position, bitboards.SQUARES[63])
         with self.assertRaises(ValueError):
             self.piece.position = (-1, 0)
         with self.assertRaises(ValueError):
@@ -46,6 +72,8 @@ class TestPiece(unittest.TestCase):
         self.assertEqual(
             self.piece.coords, (2 * constants.SQUARE_SIZE, 4 * constants.SQUARE_SIZE)
         )
+        # The coordinates are shared with the precomputed table
+        self.assertIs(self.piece.coords, pieces.SQUARE_COORDS[34])
 
     def test_legal_moves(self):
         self.assertEqual(self.piece.legal_moves, ((1, 0), (2, 0)))
@@ -53,6 +81,12 @@ class TestPiece(unittest.TestCase):
         self.piece.refresh_legal_moves(self.board)
         self.assertEqual(self.piece.legal_moves, ())
 
+    def test_legal_moves_bitboard(self):
+        self.assertEqual(self.piece.legal_moves_bitboard, (1 << 8) | (1 << 16))
+        self.piece.position = (7, 7)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(self.piece.legal_moves_bitboard, 0)
+
     def test__generate_possible_moves(self):
         self.assertEqual(self.piece.legal_moves, ((1, 0), (2, 0)))
         self.piece.position = (7, 7)
@@ -65,6 +99,65 @@ class TestPiece(unittest.TestCase):
         self.piece.refresh_legal_moves(self.board)
         self.assertEqual(self.piece.legal_moves, ((7, 5),))
 
+    def test_refresh_legal_moves_cache(self):
+        # Count the legal moves generated, as opposed to taken from the cache
+        generate = unittest.mock.patch.object(
+            pieces.Pawn,
+            "_generate_legal_moves",
+            autospec=True,
+            side_effect=pieces.Pawn._generate_legal_moves,
+        ).start()
+        self.addCleanup(unittest.mock.patch.stopall)
+
+        # Legal moves of a position met before are taken from the cache
+        self.piece.position = (6, 5)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(generate.call_count, 1)
+        self.piece.position = (0, 0)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(self.piece.legal_moves, ((1, 0), (2, 0)))
+
+        # The least recently used position is evicted first: (6, 5), as (0, 0)
+        # was used again since
+        unittest.mock.patch.object(pieces, "LEGAL_MOVES_CACHE_SIZE", 2).start()
+        self.piece.position = (1, 0)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(generate.call_count, 2)
+        self.piece.position = (0, 0)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(generate.call_count, 2)
+        self.piece.position = (6, 5)
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(generate.call_count, 3)
+        self.assertEqual(
+            [key[1] for key in self.piece._Piece__legal_moves_cache],
+            [(0, 0), (6, 5)],
+        )
+
+        # ...but not when the board has changed since
+        self.piece.position = (0, 0)
+        self.board._place_piece(pieces.Knight("white", (2, 0)))
+        self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(self.piece.legal_moves, ((1, 0),))
+
+        # The cache is bounded
+        unittest.mock.patch.stopall()
+        for file in range(8):
+            for rank in range(8):
+                self.piece.position = (rank, file)
+                self.piece.refresh_legal_moves(self.board)
+        self.assertEqual(
+            len(self.piece._Piece__legal_moves_cache), pieces.LEGAL_MOVES_CACHE_SIZE
+        )
+
+    def test_refresh_legal_moves_position_list(self):
+        # A position given as a list is stored as a tuple, so it can be cached
+        rook = pieces.Rook("white", [4, 4])
+        self.assertIs(rook.position, bitboards.SQUARES[36])
+        self.board._place_piece(rook)
+        self.assertIn((4, 0), rook.legal_moves)
+
     def test_from_algebraic_notation(self):
         position = (0, 0)
 
@@ -124,12 +217,25 @@ class TestPiece(unittest.TestCase):
         self.assertNotEqual(piece1, piece3)
         self.assertNotEqual(piece1, piece4)
         self.assertNotEqual(piece1, piece5)
+        self.assertEqual(piece1, piece1)
+        self.assertEqual(hash(piece1), hash(piece2))
+
+        # Equality requires the exact same piece class
+        class CustomPawn(pieces.Pawn):
+            __slots__ = ()
+
+        self.assertNotEqual(piece1, CustomPawn(color="black", position=(0, 0)))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.piece.unknown_attribute = None
 
 
 class TestPawn(unittest.TestCase):
     def setUp(self):
         self.pawn = pieces.Pawn(color="white", position=(6, 0))
-        self.board = board.Board()
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
         self.board._place_piece(self.pawn)
 
     def test_init(self):
@@ -220,7 +326,8 @@ class TestPawn(unittest.TestCase):
 
 class TestRook(unittest.TestCase):
     def setUp(self):
-        self.board = board.Board()
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
         self.rook = pieces.Rook("white", (0, 0))
         self.board._place_piece(self.rook)
 
@@ -276,7 +383,8 @@ class TestRook(unittest.TestCase):
 
 class TestKnight(unittest.TestCase):
     def setUp(self):
-        self.board = board.Board()
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
         self.knight = pieces.Knight("white", (0, 1))
         self.board._place_piece(self.knight)
 
@@ -288,13 +396,9 @@ class TestKnight(unittest.TestCase):
 
 
 class TestBishop(unittest.TestCase):
-    def setUp(self):
-        self.board = board.Board()
-        self.bishop = pieces.Bishop("white", (4, 4))
-        self.board._place_piece(self.bishop)
-
-    def test_generate_possible_moves(self):
-        expected_moves = {
+    # Squares reached by a bishop on (4, 4) on an empty board
+    EXPECTED_MOVES = frozenset(
+        {
             (5, 5),
             (6, 6),
             (7, 7),
@@ -309,32 +413,24 @@ class TestBishop(unittest.TestCase):
             (2, 6),
             (1, 7),
         }
-        self.assertEqual(
-            self.bishop._generate_possible_moves(self.board), expected_moves
-        )
-
+    )
 
-class TestQueen(unittest.TestCase):
     def setUp(self):
-        self.board = board.Board()
-        self.queen = pieces.Queen("white", (4, 4))
-        self.board._place_piece(self.queen)
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
+        self.bishop = pieces.Bishop("white", (4, 4))
+        self.board._place_piece(self.bishop)
 
     def test_generate_possible_moves(self):
-        expected_moves = {
-            (5, 5),
-            (6, 6),
-            (7, 7),
-            (3, 3),
-            (2, 2),
-            (1, 1),
-            (0, 0),
-            (5, 3),
-            (6, 2),
-            (7, 1),
-            (3, 5),
-            (2, 6),
-            (1, 7),
+        self.assertSetEqual(
+            self.bishop._generate_possible_moves(self.board), self.EXPECTED_MOVES
+        )
+
+
+class TestQueen(unittest.TestCase):
+    # Squares reached by a queen on (4, 4) on an empty board
+    EXPECTED_MOVES = TestBishop.EXPECTED_MOVES | frozenset(
+        {
             (5, 4),
             (6, 4),
             (7, 4),
@@ -350,20 +446,24 @@ class TestQueen(unittest.TestCase):
             (4, 2),
             (4, 3),
         }
-        self.assertEqual(
-            self.queen._generate_possible_moves(self.board), expected_moves
-        )
-
+    )
 
-class TestKing(unittest.TestCase):
     def setUp(self):
-        self.board = board.Board()
-        self.king = pieces.King("white", (4, 4))
-        self.board._place_piece(self.king)
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
+        self.queen = pieces.Queen("white", (4, 4))
+        self.board._place_piece(self.queen)
 
     def test_generate_possible_moves(self):
-        # No other pieces on the board
-        expected_moves = {
+        self.assertSetEqual(
+            self.queen._generate_possible_moves(self.board), self.EXPECTED_MOVES
+        )
+
+
+class TestKing(unittest.TestCase):
+    # Squares reached by a king on (4, 4) on an empty board
+    EXPECTED_MOVES = frozenset(
+        {
             (5, 5),
             (5, 4),
             (5, 3),
@@ -373,9 +473,21 @@ class TestKing(unittest.TestCase):
             (3, 4),
             (3, 3),
         }
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+    )
+
+    def setUp(self):
+        self.board = shared_board
+        self.board.restore(empty_board_snapshot)
+        self.king = pieces.King("white", (4, 4))
+        self.board._place_piece(self.king)
+
+    def test_generate_possible_moves(self):
+        # No other pieces on the board
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), self.EXPECTED_MOVES
+        )
 
-        # Castleing, queen and king side
+        # Castling, queen and king side
         self.board._remove_piece_at_square((4, 4))
         self.king = pieces.King("white", (7, 4))
         self.board._place_piece(self.king)
@@ -384,38 +496,69 @@ class TestKing(unittest.TestCase):
 
         self.board._place_piece(pieces.Rook("white", (7, 0)))
         expected_moves = {(6, 4), (6, 3), (6, 5), (7, 5), (7, 3), (7, 6), (7, 2)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
 
-        # Castleing, queen and king side, but rook has moved
+        # Castling, queen and king side, but rook has moved
         self.board.get_piece_at_square((7, 7)).has_moved = True
         expected_moves = {(6, 4), (6, 3), (6, 5), (7, 5), (7, 3), (7, 2)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
 
-        # Castleing, queen and king side, but king has moved
+        # Castling, queen and king side, but king has moved
         self.board.get_piece_at_square((7, 7)).has_moved = False
         self.king.has_moved = True
         expected_moves = {(6, 4), (6, 3), (6, 5), (7, 5), (7, 3)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
 
-        # Castleing, queen and king side, but king is in check
+        # Castling, queen and king side, but king is in check
         self.board._place_piece(pieces.Rook(color="black", position=(6, 4)))
         self.king.has_moved = False
         expected_moves = {(6, 3), (6, 5), (7, 5), (7, 3), (6, 4)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
         self.board._remove_piece_at_square((6, 4))
 
-        # Castleing, but path is blocked by friendly piece king side
+        # Castling, but path is blocked by friendly piece king side
         self.board._place_piece(pieces.Pawn(color="white", position=(7, 6)))
         expected_moves = {(6, 3), (6, 4), (6, 5), (7, 3), (7, 2), (7, 5)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
         self.board._remove_piece_at_square((7, 6))
 
-        # Castleing, but path is under attack by distant enemy piece (enemy
+        # Castling, but path is under attack by distant enemy piece (enemy
         # queen)
         self.board._remove_piece_at_square((5, 5))
         self.board._place_piece(pieces.Queen(color="black", position=(5, 5)))
         expected_moves = {(6, 4), (6, 3), (6, 5), (7, 5), (7, 3)}
-        self.assertEqual(self.king._generate_possible_moves(self.board), expected_moves)
+        self.assertSetEqual(
+            self.king._generate_possible_moves(self.board), expected_moves
+        )
+
+    def test_castling_masks(self):
+        # Masks of the white king's rank
+        self.assertEqual(
+            bitboards.to_squares(pieces.QUEEN_SIDE_CASTLING_EMPTY << 56),
+            {(7, 1), (7, 2), (7, 3)},
+        )
+        self.assertEqual(
+            bitboards.to_squares(pieces.QUEEN_SIDE_CASTLING_SAFE << 56),
+            {(7, 0), (7, 1), (7, 2), (7, 3), (7, 4)},
+        )
+        self.assertEqual(
+            bitboards.to_squares(pieces.KING_SIDE_CASTLING_EMPTY << 56),
+            {(7, 5), (7, 6)},
+        )
+        self.assertEqual(
+            bitboards.to_squares(pieces.KING_SIDE_CASTLING_SAFE << 56),
+            {(7, 4), (7, 5), (7, 6), (7, 7)},
+        )
 
 
 if __name__ == "__main__":